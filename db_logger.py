@@ -2,6 +2,7 @@ import asyncio
 import logging
 from datetime import datetime
 
+import aiofiles
 import aiosqlite
 
 
@@ -17,8 +18,8 @@ class DatabaseLogger:
 
         line = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | {level} | {message}\n"
         async with self._file_lock:
-            with open(self.log_file, "a", encoding="utf-8") as file_obj:
-                file_obj.write(line)
+            async with aiofiles.open(self.log_file, "a", encoding="utf-8") as file_obj:
+                await file_obj.write(line)
 
     async def get_recent(self, limit: int = 50, level: str | None = None) -> list[dict]:
         query = "SELECT created_at, level, message FROM logs"
@@ -0,0 +1,46 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from signal_generator import SignalGenerator
+from signal_journal import iter_records
+
+
+def replay(path: Path) -> int:
+    total = 0
+    mismatches = 0
+    recorded_ns = 0
+    replayed_ns = 0
+
+    for record in iter_records(path):
+        total += 1
+        started = time.perf_counter_ns()
+        signal, features = SignalGenerator.evaluate(
+            record["candles"], record["lookback"], record["volume_multiplier"]
+        )
+        replayed_ns += time.perf_counter_ns() - started
+        recorded_ns += record["elapsed_ns"]
+
+        if signal != record["signal"] or features != record["features"]:
+            mismatches += 1
+            print(
+                f"MISMATCH {record['symbol']} @ {record['timestamp']:.3f}: "
+                f"journal={record['signal']} {record['features']} replay={signal} {features}"
+            )
+
+    print(f"Записей: {total}, расхождений: {mismatches}")
+    if total:
+        print(f"Среднее время оценки: журнал {recorded_ns / total / 1000:.2f} мкс, replay {replayed_ns / total / 1000:.2f} мкс")
+    return 1 if mismatches else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay the signal journal through the current strategy code")
+    parser.add_argument("path", nargs="?", default="journal", help="journal directory or a single .seg file")
+    args = parser.parse_args()
+    sys.exit(replay(Path(args.path)))
+
+
+if __name__ == "__main__":
+    main()
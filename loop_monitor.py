@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any
+
+MIN_SLOW_THRESHOLD = 0.01
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        logger: logging.Logger,
+        slow_threshold: float = 0.1,
+        interval: float = 0.01,
+        sample_interval: float = 0.005,
+        profile_dir: Path = Path("profiles"),
+    ) -> None:
+        self.logger = logger
+        self.slow_threshold = max(slow_threshold, MIN_SLOW_THRESHOLD)
+        # Ticks must be well below the threshold so that the time without a
+        # tick tracks the real block duration to within one interval.
+        self.interval = min(interval, self.slow_threshold / 4)
+        self.sample_interval = sample_interval
+        self.profile_dir = profile_dir
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.slow_events: deque[dict[str, Any]] = deque(maxlen=20)
+        self._loop_thread_id: int | None = None
+        self._last_progress = 0.0
+        self._stall_stack: tuple[float, str] | None = None
+        self._stop = threading.Event()
+        self._samples: Counter[str] = Counter()
+        self._profiler: threading.Thread | None = None
+        self._profiling = threading.Event()
+        self._profiler_lock = asyncio.Lock()
+
+    async def run(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._last_progress = time.monotonic()
+        watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                started = self._last_progress
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self._last_progress = now
+                lag = max(now - started - self.interval, 0.0)
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                # A block of B seconds leaves the loop without a tick for
+                # between B and B + interval, so nothing above the threshold
+                # slips through.
+                blocked = now - started
+                if blocked >= self.slow_threshold:
+                    self._report_stall(blocked, started)
+        finally:
+            self._stop.set()
+            self._profiling.clear()
+
+    def _report_stall(self, blocked: float, started: float) -> None:
+        # The watchdog thread only captures the stack; logging happens here,
+        # back on the loop, because the DB log queue is not thread-safe.
+        captured, self._stall_stack = self._stall_stack, None
+        stack = captured[1] if captured is not None and captured[0] == started else None
+        self.slow_events.append({"at": time.time(), "duration": blocked, "stack": stack})
+        if stack:
+            self.logger.warning("Event loop заблокирован на %.3f с:\n%s", blocked, stack)
+        else:
+            self.logger.warning("Event loop заблокирован на %.3f с", blocked)
+
+    def _loop_frame(self):
+        return sys._current_frames().get(self._loop_thread_id)
+
+    def _watch(self) -> None:
+        # Capture at half the threshold: by then the loop is past its last
+        # tick's interval and inside the blocking call, and any block that
+        # reaches the threshold stays in that window for several polls.
+        captured_for = None
+        while not self._stop.wait(self.interval):
+            started = self._last_progress
+            if started == captured_for or time.monotonic() - started < self.slow_threshold / 2:
+                continue
+            frame = self._loop_frame()
+            if frame is not None:
+                self._stall_stack = (started, "".join(traceback.format_stack(frame)))
+                captured_for = started
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiling.is_set()
+
+    async def start_profiling(self) -> None:
+        async with self._profiler_lock:
+            if self._profiler is not None:
+                return
+            self._samples = Counter()
+            self._profiling.set()
+            self._profiler = threading.Thread(target=self._sample, name="loop-profiler", daemon=True)
+            self._profiler.start()
+
+    async def stop_profiling(self) -> Path | None:
+        async with self._profiler_lock:
+            if self._profiler is None:
+                return None
+            self._profiling.clear()
+            await asyncio.to_thread(self._profiler.join)
+            self._profiler = None
+            return await asyncio.to_thread(self._write_profile, self._samples)
+
+    def _sample(self) -> None:
+        while self._profiling.is_set():
+            frame = self._loop_frame()
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self._samples[";".join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+
+    def _write_profile(self, samples: Counter[str]) -> Path:
+        # Brendan Gregg's folded-stack format, readable by flamegraph.pl and speedscope.
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"loop-{time.time_ns()}.folded"
+        with open(path, "w", encoding="utf-8") as file_obj:
+            for stack, count in samples.most_common():
+                file_obj.write(f"{stack} {count}\n")
+        return path
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "slow_threshold": self.slow_threshold,
+            "profiling": self.profiling,
+            "slow_events": list(self.slow_events),
+        }
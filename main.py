@@ -13,8 +13,11 @@ from dotenv import load_dotenv
 
 from config_manager import ConfigManager
 from db_logger import DBLogHandler, DatabaseLogger
+from loop_monitor import LoopMonitor
 from pair_manager import PairManager
+from risk_engine import RiskEngine
 from signal_generator import SignalGenerator
+from signal_journal import SignalJournal
 from trader import Trader
 from web_interface import WebInterface
 
@@ -22,6 +25,7 @@ load_dotenv()
 
 DB_PATH = Path("trading_bot.db")
 MASTER_KEY_PATH = Path("master.key")
+JOURNAL_DIR = Path("journal")
 
 
 class EncryptedSettings:
@@ -186,6 +190,8 @@ class BotContext:
     trader: Trader | None = None
     db_logger: DatabaseLogger | None = None
     config_manager: ConfigManager | None = None
+    risk_engine: RiskEngine | None = None
+    loop_monitor: LoopMonitor | None = None
     stop_event: asyncio.Event = field(default_factory=asyncio.Event)
 
     async def shutdown(self) -> None:
@@ -230,6 +236,9 @@ async def main() -> None:
     pair_manager = PairManager(db, logger)
     await pair_manager.load_pairs()
 
+    risk_engine = RiskEngine(config_manager, logger)
+    await risk_engine.load_limits()
+
     db_logger = DatabaseLogger(db, "operations.log")
     log_queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
     queue_handler = DBLogHandler(log_queue)
@@ -240,6 +249,13 @@ async def main() -> None:
     context.pair_manager = pair_manager
     context.db_logger = db_logger
     context.config_manager = config_manager
+    context.risk_engine = risk_engine
+
+    loop_monitor = LoopMonitor(
+        logger, slow_threshold=float(await config_manager.get("slow_callback_threshold", 0.1))
+    )
+    context.loop_monitor = loop_monitor
+    context.tasks.append(asyncio.create_task(loop_monitor.run()))
 
     async def log_processor() -> None:
         while context.running:
@@ -271,12 +287,20 @@ async def main() -> None:
 
     context.tasks.append(asyncio.create_task(log_processor()))
 
+    journal = SignalJournal(JOURNAL_DIR, logger)
+    context.tasks.append(asyncio.create_task(journal.run()))
+
     if api_key and api_secret:
         try:
             exchange = await create_exchange(api_key, api_secret)
             context.exchange = exchange
-            context.signal_generator = SignalGenerator(exchange, logger, config_manager)
-            context.trader = Trader(exchange, pair_manager, db, logger, config_manager)
+            context.signal_generator = SignalGenerator(exchange, logger, config_manager, journal)
+            context.trader = Trader(exchange, pair_manager, db, logger, config_manager, risk_engine)
+            await context.trader.load_exposure()
+            try:
+                await context.trader.refresh_equity()
+            except Exception as exc:
+                logger.warning("Не удалось получить баланс, риск-движок ждёт следующей сверки: %s", exc)
             context.tasks.append(asyncio.create_task(context.trader.check_positions_and_orders()))
             context.tasks.append(asyncio.create_task(signal_loop()))
             logger.info("Подключение к MEXC успешно")
@@ -0,0 +1,139 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class RiskLimits:
+    risk_per_trade: float = 5.0
+    max_total_notional: float = 0.0
+    max_pair_notional: float = 0.0
+    max_bucket_notional: float = 0.0
+    max_margin_usage: float = 100.0
+    correlation_buckets: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Exposure:
+    notional: float = 0.0
+    margin: float = 0.0
+    bucket: str | None = None
+
+
+@dataclass
+class Reservation:
+    symbol: str
+    notional: float
+    margin: float
+    bucket: str | None = None
+
+
+class RiskEngine:
+    def __init__(self, config_manager, logger: logging.Logger) -> None:
+        self.config_manager = config_manager
+        self.logger = logger
+        self.limits = RiskLimits()
+        self.equity = 0.0
+        self.total_notional = 0.0
+        self.margin_used = 0.0
+        self.pairs: dict[str, Exposure] = {}
+        self.buckets: dict[str, float] = {}
+
+    async def load_limits(self) -> None:
+        # Limits are pulled once here so that reserve() never has to await.
+        buckets = await self.config_manager.get("correlation_buckets", {}) or {}
+        self.limits = RiskLimits(
+            risk_per_trade=float(await self.config_manager.get("risk_per_trade", 5.0)),
+            max_total_notional=float(await self.config_manager.get("max_total_notional", 0.0)),
+            max_pair_notional=float(await self.config_manager.get("max_pair_notional", 0.0)),
+            max_bucket_notional=float(await self.config_manager.get("max_bucket_notional", 0.0)),
+            max_margin_usage=float(await self.config_manager.get("max_margin_usage", 100.0)),
+            correlation_buckets={str(k).upper(): str(v) for k, v in buckets.items()},
+        )
+
+    def update_equity(self, equity: float) -> None:
+        self.equity = max(float(equity), 0.0)
+
+    def bucket_for(self, symbol: str) -> str | None:
+        return self.limits.correlation_buckets.get(symbol.upper())
+
+    def reserve(self, symbol: str, price: float, leverage: int) -> Reservation | None:
+        # Synchronous on purpose: with no await between the checks and the
+        # bookkeeping, concurrent signals on the same loop cannot interleave.
+        if self.equity <= 0:
+            self.logger.warning("Баланс неизвестен или равен нулю, ордер по %s пропущен", symbol)
+            return None
+        if price <= 0 or leverage <= 0:
+            self.logger.warning("Некорректная цена или плечо для %s: %s, %s", symbol, price, leverage)
+            return None
+
+        limits = self.limits
+        notional = self.equity * (limits.risk_per_trade / 100.0) * leverage
+
+        if limits.max_margin_usage > 0:
+            margin_cap = self.equity * (limits.max_margin_usage / 100.0)
+            notional = min(notional, (margin_cap - self.margin_used) * leverage)
+
+        if limits.max_total_notional > 0:
+            notional = min(notional, limits.max_total_notional - self.total_notional)
+
+        exposure = self.pairs.get(symbol)
+        if limits.max_pair_notional > 0:
+            current = exposure.notional if exposure else 0.0
+            notional = min(notional, limits.max_pair_notional - current)
+
+        bucket = exposure.bucket if exposure else self.bucket_for(symbol)
+        if bucket is not None and limits.max_bucket_notional > 0:
+            notional = min(notional, limits.max_bucket_notional - self.buckets.get(bucket, 0.0))
+
+        if notional <= 0:
+            self.logger.info("Риск-лимит исчерпан для %s", symbol)
+            return None
+        return self._book(symbol, notional, leverage)
+
+    def restore(self, symbol: str, notional: float, leverage: int) -> Reservation | None:
+        # Books exposure that already exists on the exchange, bypassing the caps.
+        if notional <= 0 or leverage <= 0:
+            return None
+        return self._book(symbol, notional, leverage)
+
+    def _book(self, symbol: str, notional: float, leverage: int) -> Reservation:
+        exposure = self.pairs.get(symbol)
+        if exposure is None:
+            exposure = self.pairs[symbol] = Exposure(bucket=self.bucket_for(symbol))
+        reservation = Reservation(symbol, notional, notional / leverage, exposure.bucket)
+        exposure.notional += reservation.notional
+        exposure.margin += reservation.margin
+        self.total_notional += reservation.notional
+        self.margin_used += reservation.margin
+        if reservation.bucket is not None:
+            self.buckets[reservation.bucket] = self.buckets.get(reservation.bucket, 0.0) + reservation.notional
+        return reservation
+
+    def release(self, reservation: Reservation) -> None:
+        self.total_notional = max(self.total_notional - reservation.notional, 0.0)
+        self.margin_used = max(self.margin_used - reservation.margin, 0.0)
+
+        exposure = self.pairs.get(reservation.symbol)
+        if exposure is not None:
+            exposure.notional -= reservation.notional
+            exposure.margin -= reservation.margin
+            if exposure.notional <= 1e-12:
+                del self.pairs[reservation.symbol]
+
+        bucket = reservation.bucket
+        if bucket is not None:
+            remaining = self.buckets.get(bucket, 0.0) - reservation.notional
+            if remaining > 1e-12:
+                self.buckets[bucket] = remaining
+            else:
+                self.buckets.pop(bucket, None)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "equity": self.equity,
+            "total_notional": self.total_notional,
+            "margin_used": self.margin_used,
+            "pairs": {s: {"notional": e.notional, "margin": e.margin} for s, e in self.pairs.items()},
+            "buckets": dict(self.buckets),
+        }
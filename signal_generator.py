@@ -1,24 +1,23 @@
 import logging
+import time
 
 import ccxt.async_support as ccxt
 
+from signal_journal import SignalJournal
+
 
 class SignalGenerator:
-    def __init__(self, exchange: ccxt.Exchange, logger: logging.Logger, config_manager) -> None:
-        self.exchange = exchange
-        self.logger = logger
-        self.config_manager = config_manager
     def __init__(
         self,
         exchange: ccxt.Exchange,
         logger: logging.Logger,
-        lookback: int = 20,
-        volume_multiplier: float = 1.5,
+        config_manager,
+        journal: SignalJournal | None = None,
     ) -> None:
         self.exchange = exchange
         self.logger = logger
-        self.lookback = lookback
-        self.volume_multiplier = volume_multiplier
+        self.config_manager = config_manager
+        self.journal = journal
 
     async def fetch_ohlcv(self, symbol: str, limit: int = 100) -> list:
         try:
@@ -27,14 +26,8 @@ class SignalGenerator:
             self.logger.error("fetch_ohlcv failed for %s: %s", symbol, exc)
             return []
 
-    async def generate_signal(self, symbol: str) -> str | None:
-        lookback = int(await self.config_manager.get("lookback", 20))
-        volume_multiplier = float(await self.config_manager.get("volume_multiplier", 1.5))
-
-        candles = await self.fetch_ohlcv(symbol, limit=lookback + 5)
-        if len(candles) < lookback + 1:
-            return None
-
+    @staticmethod
+    def evaluate(candles: list, lookback: int, volume_multiplier: float) -> tuple[str | None, dict[str, float]]:
         recent = candles[-(lookback + 1) :]
         current = recent[-1]
         previous = recent[:-1]
@@ -44,17 +37,38 @@ class SignalGenerator:
         volumes_prev = [c[5] for c in previous]
         closes_prev = [c[4] for c in previous]
 
-        local_high = max(highs_prev)
-        local_low = min(lows_prev)
-        avg_volume = sum(volumes_prev) / len(volumes_prev)
-        momentum = closes_prev[-1] - closes_prev[-3] if len(closes_prev) >= 3 else 0
+        features = {
+            "local_high": max(highs_prev),
+            "local_low": min(lows_prev),
+            "avg_volume": sum(volumes_prev) / len(volumes_prev),
+            "momentum": closes_prev[-1] - closes_prev[-3] if len(closes_prev) >= 3 else 0,
+        }
 
         current_high = current[2]
         current_low = current[3]
         current_volume = current[5]
+        volume_ok = current_volume > features["avg_volume"] * volume_multiplier
+
+        if current_high > features["local_high"] and volume_ok and features["momentum"] > 0:
+            return "LONG", features
+        if current_low < features["local_low"] and volume_ok and features["momentum"] < 0:
+            return "SHORT", features
+        return None, features
+
+    async def generate_signal(self, symbol: str) -> str | None:
+        lookback = int(await self.config_manager.get("lookback", 20))
+        volume_multiplier = float(await self.config_manager.get("volume_multiplier", 1.5))
+
+        candles = await self.fetch_ohlcv(symbol, limit=lookback + 5)
+        if len(candles) < lookback + 1:
+            return None
+
+        started = time.perf_counter_ns()
+        signal, features = self.evaluate(candles, lookback, volume_multiplier)
+        elapsed_ns = time.perf_counter_ns() - started
 
-        if current_high > local_high and current_volume > avg_volume * volume_multiplier and momentum > 0:
-            return "LONG"
-        if current_low < local_low and current_volume > avg_volume * volume_multiplier and momentum < 0:
-            return "SHORT"
-        return None
+        if self.journal is not None:
+            self.journal.record(
+                symbol, lookback, volume_multiplier, signal, features, candles[-(lookback + 1) :], elapsed_ns
+            )
+        return signal
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+MAGIC = b"SGJ2"
+# timestamp, symbol length, lookback, volume_multiplier, signal, local_high,
+# local_low, avg_volume, momentum, elapsed_ns, candle count; followed by the
+# symbol bytes and the candles
+RECORD_HEADER = struct.Struct("<dHIdBddddQH")
+# timestamp, open, high, low, close, volume
+CANDLE = struct.Struct("<6d")
+
+SIGNAL_CODES = {None: 0, "LONG": 1, "SHORT": 2}
+SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+
+class SignalJournal:
+    def __init__(
+        self,
+        directory: Path,
+        logger: logging.Logger,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        segment_bytes: int = 64 * 1024 * 1024,
+        max_pending: int = 100_000,
+    ) -> None:
+        self.directory = directory
+        self.logger = logger
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._pending: list[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._segment: Path | None = None
+        self._write_lock = threading.Lock()
+
+    def record(
+        self,
+        symbol: str,
+        lookback: int,
+        volume_multiplier: float,
+        signal: str | None,
+        features: dict[str, float],
+        candles: list,
+        elapsed_ns: int,
+    ) -> None:
+        # Only a tuple append on the hot path; packing happens in the writer thread.
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(
+            (time.time(), symbol, lookback, volume_multiplier, signal, features, candles, elapsed_ns)
+        )
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                self._report_dropped()
+                batch = self._take_batch()
+                if batch:
+                    try:
+                        skipped = await asyncio.to_thread(self._write_batch, batch)
+                    except Exception as exc:
+                        self.logger.error("Не удалось записать журнал сигналов: %s", exc)
+                    else:
+                        self._report_skipped(skipped)
+        finally:
+            self._report_dropped()
+            batch = self._take_batch()
+            if batch:
+                try:
+                    self._report_skipped(self._write_batch(batch))
+                except Exception as exc:
+                    self.logger.error("Не удалось записать журнал сигналов: %s", exc)
+
+    def _report_skipped(self, skipped: list[str]) -> None:
+        # Called on the loop: the DB log queue is not thread-safe.
+        for error in skipped:
+            self.logger.error("Запись журнала сигналов пропущена: %s", error)
+
+    def _report_dropped(self) -> None:
+        dropped = self.dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped = self.dropped
+            self.logger.error(
+                "Буфер журнала сигналов переполнен: потеряно %d записей (всего %d)", dropped, self.dropped
+            )
+
+    def _take_batch(self) -> list[tuple]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _current_segment(self) -> Path:
+        if self._segment is None or self._segment.stat().st_size >= self.segment_bytes:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._segment = self.directory / f"signals-{time.time_ns()}.seg"
+            self._segment.write_bytes(MAGIC)
+        return self._segment
+
+    def _write_batch(self, batch: list[tuple]) -> list[str]:
+        chunks = []
+        skipped = []
+        for record in batch:
+            try:
+                chunks.append(self._pack(*record))
+            except (struct.error, KeyError, TypeError, ValueError) as exc:
+                skipped.append(f"{record[1]}: {exc}")
+        if chunks:
+            with self._write_lock, open(self._current_segment(), "ab") as file_obj:
+                file_obj.write(b"".join(chunks))
+        return skipped
+
+    @staticmethod
+    def _pack(
+        ts: float,
+        symbol: str,
+        lookback: int,
+        volume_multiplier: float,
+        signal: str | None,
+        features: dict[str, float],
+        candles: list,
+        elapsed_ns: int,
+    ) -> bytes:
+        symbol_bytes = symbol.encode()
+        header = RECORD_HEADER.pack(
+            ts,
+            len(symbol_bytes),
+            lookback,
+            volume_multiplier,
+            SIGNAL_CODES[signal],
+            features["local_high"],
+            features["local_low"],
+            features["avg_volume"],
+            features["momentum"],
+            elapsed_ns,
+            len(candles),
+        )
+        body = b"".join(CANDLE.pack(*(float(v or 0.0) for v in candle[:6])) for candle in candles)
+        return header + symbol_bytes + body
+
+
+def iter_records(path: Path) -> Iterator[dict[str, Any]]:
+    segments = sorted(path.glob("*.seg")) if path.is_dir() else [path]
+    for segment in segments:
+        data = segment.read_bytes()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{segment}: not a signal journal segment")
+        offset = len(MAGIC)
+        while offset + RECORD_HEADER.size <= len(data):
+            (
+                ts,
+                symbol_length,
+                lookback,
+                volume_multiplier,
+                signal,
+                local_high,
+                local_low,
+                avg_volume,
+                momentum,
+                elapsed_ns,
+                count,
+            ) = RECORD_HEADER.unpack_from(data, offset)
+            offset += RECORD_HEADER.size
+            if offset + symbol_length + count * CANDLE.size > len(data):
+                break
+            symbol = data[offset : offset + symbol_length].decode()
+            offset += symbol_length
+            candles = [list(CANDLE.unpack_from(data, offset + i * CANDLE.size)) for i in range(count)]
+            offset += count * CANDLE.size
+            yield {
+                "timestamp": ts,
+                "symbol": symbol,
+                "lookback": lookback,
+                "volume_multiplier": volume_multiplier,
+                "signal": SIGNAL_NAMES[signal],
+                "features": {
+                    "local_high": local_high,
+                    "local_low": local_low,
+                    "avg_volume": avg_volume,
+                    "momentum": momentum,
+                },
+                "candles": candles,
+                "elapsed_ns": elapsed_ns,
+            }
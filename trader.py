@@ -1,10 +1,31 @@
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
 
 import aiosqlite
 import ccxt.async_support as ccxt
 
 from pair_manager import PairManager
+from risk_engine import Reservation, RiskEngine
+
+FINAL_ORDER_STATUSES = {"closed", "canceled", "expired", "rejected"}
+
+
+@dataclass
+class TrackedOrder:
+    symbol: str
+    side: str
+    price: float
+    placed_at: float
+    cancel_after: int
+    reservation: Reservation | None
+
+
+@dataclass
+class TrackedPosition:
+    symbol: str
+    reservation: Reservation | None
 
 
 class Trader:
@@ -15,12 +36,16 @@ class Trader:
         db: aiosqlite.Connection,
         logger: logging.Logger,
         config_manager,
+        risk_engine: RiskEngine,
     ) -> None:
         self.exchange = exchange
         self.pair_manager = pair_manager
         self.db = db
         self.logger = logger
         self.config_manager = config_manager
+        self.risk_engine = risk_engine
+        self.open_orders: dict[str, TrackedOrder] = {}
+        self.open_positions: dict[int, TrackedPosition] = {}
 
     async def has_open_position(self, symbol: str) -> bool:
         cursor = await self.db.execute(
@@ -30,24 +55,45 @@ class Trader:
         await cursor.close()
         return row is not None
 
-    async def calculate_quantity(self, symbol: str, side: str, leverage: int) -> float:
-        risk_percent = float(await self.config_manager.get("risk_per_trade", 5.0))
+    async def refresh_equity(self) -> None:
         balance = await self.exchange.fetch_balance()
-        free_usdt = float(balance.get("USDT", {}).get("free", 0.0))
+        self.risk_engine.update_equity(float(balance.get("USDT", {}).get("total") or 0.0))
 
-        ticker = await self.exchange.fetch_ticker(symbol)
-        price = float(ticker.get("last") or 0.0)
-        if price <= 0:
-            return 0.0
+    def get_leverage(self, symbol: str) -> int:
+        settings = self.pair_manager.get_pair_settings(symbol) or {}
+        return int(settings.get("leverage", 10))
 
-        max_margin = free_usdt * (risk_percent / 100.0)
-        quantity = (max_margin * leverage) / price
-        return max(quantity, 0.0)
+    async def load_exposure(self) -> None:
+        cursor = await self.db.execute(
+            "SELECT id, symbol, side, price, amount, strftime('%s', created_at), cancel_after FROM orders WHERE status = 'open'"
+        )
+        order_rows = await cursor.fetchall()
+        await cursor.close()
+        cursor = await self.db.execute("SELECT id, symbol, entry_price, quantity FROM positions WHERE status = 'open'")
+        position_rows = await cursor.fetchall()
+        await cursor.close()
+
+        now = time.time()
+        for order_id, symbol, side, price, amount, created_at, cancel_after in order_rows:
+            reservation = self.risk_engine.restore(
+                symbol, float(price or 0.0) * float(amount or 0.0), self.get_leverage(symbol)
+            )
+            self.open_orders[order_id] = TrackedOrder(
+                symbol,
+                side,
+                float(price or 0.0),
+                float(created_at) if created_at else now,
+                int(cancel_after or 0),
+                reservation,
+            )
+        for position_id, symbol, entry_price, quantity in position_rows:
+            reservation = self.risk_engine.restore(
+                symbol, float(entry_price or 0.0) * float(quantity or 0.0), self.get_leverage(symbol)
+            )
+            self.open_positions[position_id] = TrackedPosition(symbol, reservation)
 
     async def place_limit_order(self, symbol: str, side: str, cancel_after: int) -> str:
-        settings = self.pair_manager.get_pair_settings(symbol) or {}
-        leverage = int(settings.get("leverage", 10))
-        quantity = await self.calculate_quantity(symbol, side, leverage)
+        leverage = self.get_leverage(symbol)
 
         orderbook = await self.exchange.fetch_order_book(symbol)
         if side.upper() == "LONG":
@@ -57,15 +103,111 @@ class Trader:
             price = float(orderbook["asks"][0][0]) * 0.999 if orderbook.get("asks") else 0.0
             order_side = "sell"
 
-        order = await self.exchange.create_limit_order(symbol, order_side, quantity, price)
+        reservation = self.risk_engine.reserve(symbol, price, leverage)
+        if reservation is None:
+            return ""
+        quantity = reservation.notional / price
+
+        try:
+            order = await self.exchange.create_limit_order(symbol, order_side, quantity, price)
+        except Exception:
+            self.risk_engine.release(reservation)
+            raise
         order_id = str(order.get("id", ""))
+        status = order.get("status", "open")
+        self.open_orders[order_id] = TrackedOrder(symbol, side, price, time.time(), cancel_after, reservation)
         await self.db.execute(
             "INSERT OR REPLACE INTO orders (id, symbol, side, type, price, amount, status, created_at, cancel_after) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)",
-            (order_id, symbol, side, "limit", price, quantity, order.get("status", "open"), cancel_after),
+            (order_id, symbol, side, "limit", price, quantity, status, cancel_after),
         )
         await self.db.commit()
         return order_id
 
+    async def reconcile_orders(self) -> None:
+        for order_id, tracked in list(self.open_orders.items()):
+            try:
+                order = await self.exchange.fetch_order(order_id, tracked.symbol)
+                status = order.get("status")
+                expired = tracked.cancel_after > 0 and time.time() - tracked.placed_at >= tracked.cancel_after
+                if status == "open" and expired:
+                    await self.exchange.cancel_order(order_id, tracked.symbol)
+                    order = await self.exchange.fetch_order(order_id, tracked.symbol)
+                    status = order.get("status")
+                    if status not in FINAL_ORDER_STATUSES:
+                        status = "canceled"
+            except Exception as exc:
+                self.logger.error("Не удалось проверить ордер %s: %s", order_id, exc)
+                continue
+            if status not in FINAL_ORDER_STATUSES:
+                continue
+            filled = float(order.get("filled") or 0.0)
+            fill_price = float(order.get("average") or order.get("price") or tracked.price)
+            try:
+                await self.finish_order(order_id, tracked, status, filled, fill_price)
+            except Exception as exc:
+                self.logger.error("Не удалось закрыть ордер %s: %s", order_id, exc)
+
+    async def finish_order(
+        self, order_id: str, tracked: TrackedOrder, status: str, filled: float, fill_price: float
+    ) -> None:
+        # The DB is written first; if it fails the order stays tracked and is
+        # retried on the next tick. The reservation swap below has no awaits,
+        # so no signal can slip into a gap between release and restore.
+        position_id = None
+        try:
+            await self.db.execute("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+            if filled > 0:
+                cursor = await self.db.execute(
+                    "INSERT INTO positions (symbol, side, entry_price, quantity) VALUES (?, ?, ?, ?)",
+                    (tracked.symbol, tracked.side.upper(), fill_price, filled),
+                )
+                position_id = cursor.lastrowid
+                await cursor.close()
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        self.open_orders.pop(order_id, None)
+        if tracked.reservation is not None:
+            self.risk_engine.release(tracked.reservation)
+        if position_id is not None:
+            reservation = self.risk_engine.restore(
+                tracked.symbol, filled * fill_price, self.get_leverage(tracked.symbol)
+            )
+            self.open_positions[position_id] = TrackedPosition(tracked.symbol, reservation)
+
+    async def reconcile_positions(self) -> None:
+        for position_id, tracked in list(self.open_positions.items()):
+            try:
+                positions = await self.exchange.fetch_positions([tracked.symbol])
+                if any(float(p.get("contracts") or 0.0) > 0 for p in positions):
+                    continue
+                await self.db.execute(
+                    "UPDATE positions SET status = 'closed', closed_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (position_id,),
+                )
+                await self.db.commit()
+            except Exception as exc:
+                self.logger.error("Не удалось проверить позицию %s: %s", tracked.symbol, exc)
+                continue
+
+            self.open_positions.pop(position_id, None)
+            if tracked.reservation is not None:
+                self.risk_engine.release(tracked.reservation)
+
     async def check_positions_and_orders(self) -> None:
         while True:
+            try:
+                await self.refresh_equity()
+            except Exception as exc:
+                self.logger.error("Не удалось обновить баланс: %s", exc)
+            try:
+                await self.reconcile_orders()
+            except Exception as exc:
+                self.logger.error("Ошибка сверки ордеров: %s", exc)
+            try:
+                await self.reconcile_positions()
+            except Exception as exc:
+                self.logger.error("Ошибка сверки позиций: %s", exc)
             await asyncio.sleep(10)
@@ -112,6 +112,40 @@ class WebInterface:
             await self.config_manager.set("volume_multiplier", float(data.get("volume_multiplier", 1.5)))
             await self.config_manager.set("check_interval", int(data.get("check_interval", 60)))
             await self.config_manager.set("risk_per_trade", float(data.get("risk_per_trade", 5.0)))
+            if self.context.risk_engine is not None:
+                await self.context.risk_engine.load_limits()
+            return jsonify({"success": True})
+
+        @self.app.get("/api/risk")
+        async def get_risk():
+            risk_engine = self.context.risk_engine
+            return jsonify(
+                {
+                    "max_total_notional": float(await self.config_manager.get("max_total_notional", 0.0)),
+                    "max_pair_notional": float(await self.config_manager.get("max_pair_notional", 0.0)),
+                    "max_bucket_notional": float(await self.config_manager.get("max_bucket_notional", 0.0)),
+                    "max_margin_usage": float(await self.config_manager.get("max_margin_usage", 100.0)),
+                    "correlation_buckets": await self.config_manager.get("correlation_buckets", {}) or {},
+                    "exposure": risk_engine.snapshot() if risk_engine is not None else None,
+                }
+            )
+
+        @self.app.post("/api/risk")
+        async def save_risk():
+            data = await request.get_json() or {}
+            buckets = data.get("correlation_buckets", {}) or {}
+            if not isinstance(buckets, dict):
+                return jsonify({"success": False, "message": "correlation_buckets must be an object"}), 400
+
+            await self.config_manager.set("max_total_notional", float(data.get("max_total_notional", 0.0)))
+            await self.config_manager.set("max_pair_notional", float(data.get("max_pair_notional", 0.0)))
+            await self.config_manager.set("max_bucket_notional", float(data.get("max_bucket_notional", 0.0)))
+            await self.config_manager.set("max_margin_usage", float(data.get("max_margin_usage", 100.0)))
+            await self.config_manager.set(
+                "correlation_buckets", {str(k).upper().strip(): str(v) for k, v in buckets.items()}
+            )
+            if self.context.risk_engine is not None:
+                await self.context.risk_engine.load_limits()
             return jsonify({"success": True})
 
         @self.app.get("/api/status")
@@ -124,6 +158,26 @@ class WebInterface:
                 }
             )
 
+        @self.app.get("/api/admin/loop")
+        async def admin_loop():
+            if self.context.loop_monitor is None:
+                return jsonify({"success": False, "message": "Монитор не запущен"}), 503
+            return jsonify(self.context.loop_monitor.snapshot())
+
+        @self.app.post("/api/admin/profiler")
+        async def admin_profiler():
+            monitor = self.context.loop_monitor
+            if monitor is None:
+                return jsonify({"success": False, "message": "Монитор не запущен"}), 503
+
+            data = await request.get_json() or {}
+            if bool(data.get("enabled", False)):
+                await monitor.start_profiling()
+                return jsonify({"success": True, "profiling": True})
+
+            path = await monitor.stop_profiling()
+            return jsonify({"success": True, "profiling": False, "output": str(path) if path else None})
+
         @self.app.get("/api/logs")
         async def api_logs():
             logs = await self.db_logger.get_recent(limit=50)